@@ -0,0 +1,162 @@
+import os
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from dotenv import load_dotenv
+from typing import AsyncGenerator
+from utils import http_utils
+from utils.http_utils import CachedBearerAuth, RateLimiter, RateLimitRetryClient
+from utils.mock_api import MockAPI
+
+"""
+Shared fixtures for the Mistral API test suite.
+
+Fixtures are session-scoped so that each pytest-xdist worker builds them only once.
+By default the tests run offline against the local mock API, `--online` runs them against the real API.
+
+Options:
+    --online: Runs the tests against the real API instead of the local mock API.
+Fixtures:
+    load_env: Loads the environment variables from the .env file once per session.
+    rate_limiter: Paces the API requests to stay within `RATE_PER_MINUTE`, across pytest-xdist workers.
+    mock_api: Provides the local mock API.
+    mock_response: Selects the canned response of the mock API from the test `mock_response` marker.
+    no_real_sleep: Makes the rate limit waits instant when running offline.
+    client: Provides the shared asynchronous HTTP client reused by all tests.
+    vcr_config: Configures the cassettes used to record and replay API responses.
+"""
+
+# Never collect stray copies of test modules (e.g. "test_x copy.py", "test_x 2.py"), each test must run only once.
+# The patterns match the absolute path, so they require the space a file manager puts before the suffix.
+collect_ignore_glob = ["* copy.py", "* [0-9].py"]
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the option selecting the real API instead of the local mock API."""
+    parser.addoption("--online", action="store_true", default=False, help="Run the tests against the real Mistral API")
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Disable the cassettes when running offline, the mock API responses must never be recorded."""
+    if not config.getoption("--online"):
+        config.option.disable_recording = True
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list) -> None:
+    """Deselect the tests marked `remote` when running offline, they require the real API."""
+    if config.getoption("--online"):
+        return
+    remote = [item for item in items if item.get_closest_marker("remote")]
+    if remote:
+        config.hook.pytest_deselected(items=remote)
+        items[:] = [item for item in items if not item.get_closest_marker("remote")]
+
+@pytest.fixture(scope="session", autouse=True)
+def load_env() -> None:
+    """
+    Fixture to load environment variables from the .env file.
+    Variables already set in the environment (e.g. in CI) take precedence over the file.
+    """
+    load_dotenv()
+
+@pytest.fixture(scope="module")
+def vcr_config() -> dict:
+    """
+    Fixture to configure the cassettes used by tests marked `vcr`.
+    The API key is never written to the cassettes.
+
+    Returns:
+       dict: The vcrpy configuration.
+    """
+    return {"filter_headers": ["authorization"]}
+
+@pytest.fixture(scope="session")
+def rate_limiter(tmp_path_factory: pytest.TempPathFactory, worker_id: str) -> RateLimiter:
+    """
+    Fixture to provide the limiter pacing the API requests.
+    The budget is read from the `RATE_PER_MINUTE` environment variable, no pacing when unset.
+    Under pytest-xdist, the workers share the limiter state through a file in the common temporary directory.
+
+    Args:
+       tmp_path_factory (pytest.TempPathFactory): The pytest temporary directory factory.
+       worker_id (str): The pytest-xdist worker id, "master" when not distributed.
+
+    Returns:
+       RateLimiter: The limiter shared by all requests of the session.
+    """
+    rate_per_minute = os.getenv("RATE_PER_MINUTE")
+    state_file = None
+    if worker_id != "master":
+        state_file = tmp_path_factory.getbasetemp().parent / "rate_limiter.json"
+    return RateLimiter(float(rate_per_minute) if rate_per_minute else None, state_file)
+
+@pytest.fixture(scope="session")
+def mock_api() -> MockAPI:
+    """
+    Fixture to provide the local mock API, shared by all tests of the session.
+
+    Returns:
+       MockAPI: The mock API.
+    """
+    return MockAPI()
+
+@pytest.fixture(autouse=True)
+def mock_response(request: pytest.FixtureRequest, mock_api: MockAPI) -> None:
+    """
+    Fixture to select the canned response of the mock API for the current test.
+    The scenario is the argument of the test `mock_response` marker, none when unmarked.
+    The request count of the mock API is reset for each test.
+
+    Args:
+       request (pytest.FixtureRequest): The pytest request object.
+       mock_api (MockAPI): The local mock API.
+    """
+    marker = request.node.get_closest_marker("mock_response")
+    mock_api.scenario = marker.args[0] if marker else None
+    mock_api.request_count = 0
+
+async def no_sleep(delay: float) -> None:
+    """Yield to the event loop without waiting."""
+    await asyncio.sleep(0)
+
+@pytest.fixture(autouse=True)
+def no_real_sleep(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Fixture to make the rate limit waits instant when running offline.
+    The rate limit logic still runs against the mock API, without burning wall-clock time.
+
+    Args:
+       request (pytest.FixtureRequest): The pytest request object.
+       monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch object.
+    """
+    if not request.config.getoption("--online"):
+        monkeypatch.setattr(http_utils, "sleep", no_sleep)
+
+@pytest_asyncio.fixture(scope="session")
+async def client(request: pytest.FixtureRequest, rate_limiter: RateLimiter, mock_api: MockAPI) -> AsyncGenerator[httpx.AsyncClient, None]:
+    """
+    Fixture to provide the shared asynchronous HTTP client for the tests.
+    The client keeps its connection open across tests and closes it at teardown.
+    HTTP/2 multiplexes concurrent requests over a single TCP+TLS connection.
+    Online, httpx builds the transport itself, so the `HTTP_PROXY`/`HTTPS_PROXY` environment variables are honored.
+    Offline, the client is routed to the local mock API and requests never touch a socket.
+    Requests are paced in a `request` event hook, outside of the `response.elapsed` timer.
+
+    Args:
+       request (pytest.FixtureRequest): The pytest request object.
+       rate_limiter (RateLimiter): The limiter pacing the API requests.
+       mock_api (MockAPI): The local mock API.
+
+    Yields:
+       httpx.AsyncClient: The client bound to the API base URL and authenticated with the API key.
+    """
+    if request.config.getoption("--online"):
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        options = {"http2": True, "limits": limits, "base_url": os.getenv("BASE_URL")}
+    else:
+        options = {"transport": mock_api.transport(), "base_url": "http://mock"}
+    async with RateLimitRetryClient(
+        auth=CachedBearerAuth(),
+        event_hooks={"request": [rate_limiter.wait]},
+        timeout=30,
+        **options,
+    ) as client:
+        yield client
@@ -1,8 +1,10 @@
-from locust import HttpUser, task, between, events
+from locust import FastHttpUser, task, between, events
 import os
+import json
+import gevent
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables, the ones already set (e.g. in CI) take precedence
 load_dotenv()
 
 API_KEY = os.getenv("MISTRAL_API_KEY")
@@ -14,34 +16,54 @@ HEADERS = {
 }
 MODEL = 'mistral-large-latest'
 
+# Serialize the request payload once, every task posts the same bytes
+PAYLOAD_BYTES = json.dumps({
+    "model": MODEL,
+    "messages": [{"role": "user", "content": "Hello, Locust is testing you!"}],
+}).encode()
+
 # Default values for test parameters
 DEFAULT_SPAWN_RATE = 2
 DEFAULT_RUN_TIME = "1m"
 DEFAULT_HOST = BASE_URL
+DEFAULT_PARALLEL_PER_USER = 1
 
 @events.init_command_line_parser.add_listener
 def add_custom_arguments(parser):
-    """Set default values for Locust's command-line arguments."""
+    """Add custom arguments and set default values for Locust's command-line arguments."""
+    parser.add_argument(
+        "--parallel-per-user",
+        type=int,
+        default=DEFAULT_PARALLEL_PER_USER,
+        help="Number of concurrent requests sent by each user per task",
+    )
     parser.set_defaults(
         spawn_rate=DEFAULT_SPAWN_RATE,
         run_time=DEFAULT_RUN_TIME,
         host=DEFAULT_HOST,
     )
 
-class MistralUser(HttpUser):
+class MistralUser(FastHttpUser):
     """Simulates a user sending requests to the Mistral API."""
-    wait_time = between(3, 6) 
+    wait_time = between(3, 6)
+    network_timeout = 30.0
+    connection_timeout = 10.0
 
     @task
     def send_request(self):
-        """Task to send a chat completion request."""
-        payload = {
-            "model": MODEL,
-            "messages": [{"role": "user", "content": "Hello, Locust is testing you!"}],
-        }
+        """Task to send one or several concurrent chat completion requests."""
+        parallel = getattr(self.environment.parsed_options, "parallel_per_user", DEFAULT_PARALLEL_PER_USER)
+        if parallel <= 1:
+            self.post_chat_completion()
+            return
+        jobs = [gevent.spawn(self.post_chat_completion) for _ in range(parallel)]
+        gevent.joinall(jobs, timeout=self.network_timeout)
+
+    def post_chat_completion(self):
+        """Send a chat completion request and record its outcome."""
         with self.client.post(
             API_ENDPOINT,
-            json=payload,
+            data=PAYLOAD_BYTES,
             headers=HEADERS,
             catch_response=True
         ) as response:
@@ -1,11 +1,8 @@
-import os
-import requests
+import httpx
 import pytest
-from dotenv import load_dotenv
-import time
-import json
-from utils.api_utils import assert_basic_data_structure, is_valid_json, get_model_token_limit
-from typing import Generator
+import orjson
+from utils.api_utils import assert_basic_data_structure, is_valid_json, get_model_token_limit, RepeatedMessagePayload
+from typing import Callable, Generator
 
 """
 This module contains a suite of tests for the Mistral API, focusing on chat completion endpoints.
@@ -14,16 +11,24 @@ the API behaves as expected under different conditions.
 
 Fixtures:
     model_name: Provides different model names for the tests.
-    after_each_test: Introduces a delay after each test to avoid hitting rate limits.
+    token_overflow_payload: Provides the streamed request exceeding the model's token limit.
+    positive_payloads: Provides the encoded payloads of the positive cases for the model.
+    client: Shared fixture defined in conftest.py, bound to the local mock API unless `--online` is given.
+Markers:
+    serial: Rate limit or timing sensitive tests, run in a separate single process pass.
+    remote: Tests that require the real API, deselected without `--online`.
+    vcr: Tests replayed from recorded cassettes in test/cassettes when running online.
+    mock_response: Canned response of the local mock API used by the test.
 Tests:
-    - test_valid_request: Tests API with a valid request.
-    - test_response_format: Tests the response format parameter for a given model.
+    - test_positive_case: Tests API with a valid request of each positive case:
+        - valid_request: Tests API with a valid request.
+        - response_format: Tests the response format parameter for a given model.
+        - multiple_messages: Tests the API with multiple messages to ensure it responds correctly.
+        - hot_temperature: Tests request with high temperature parameters.
+        - stop_token: Tests the API request with invalid parameters to ensure the response stops at the specified keyword.
+        - mistral_tool: Tests the Mistral tool functionality by sending a request to the API and verifying the response.
     - test_response_time: Tests the API response time for a given model.
-    - test_multiple_messages: Tests the API with multiple messages to ensure it responds correctly.
     - test_streaming_response: Tests streaming response mode.
-    - test_hot_temperature: Tests request with high temperature parameters.
-    - test_stop_token: Tests the API request with invalid parameters to ensure the response stops at the specified keyword.
-    - test_mistral_tool: Tests the Mistral tool functionality by sending a request to the API and verifying the response.
     - test_empty_messages: Tests the API's response when provided with an empty list of messages.
     - test_long_message: Tests the API with a long input message.
     - test_token_limit: Tests that the model handles token limit correctly.
@@ -34,24 +39,28 @@ Tests:
     - test_invalid_model: Tests API with an invalid model.
 """
 
-# Load environment variables
-load_dotenv()
+# Run every test on the session event loop shared with the client
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-# Retrieve API key and base URL from environment variables
-API_KEY = os.getenv("MISTRAL_API_KEY")
-BASE_URL = os.getenv("BASE_URL")
-
-# Define the API endpoint and complete URL
+# Define the API endpoint
 API_ENDPOINT = "/v1/chat/completions"
-URL = BASE_URL + API_ENDPOINT
 
-# Set delay between tests to avoid hitting rate limits
-DELAY = 3  # seconds
+# Define the header for raw JSON bodies, `json=` requests get it from the client
+JSON_HEADERS = {"Content-Type": "application/json"}
 
-# Define headers for the API requests
-headers = {
-    "Authorization": f"Bearer {API_KEY}",
-    "Content-Type": "application/json",
+# Define the models under test
+MODELS = [
+    "mistral-large-latest",
+    "mistral-small-latest",
+    "ministral-8b-latest",
+    # "ministral-3b-latest",
+]
+
+# Define the long input message and its encoded payload for each model
+LONG_MESSAGE = "This is a test message. " * 100  # Repeat to create a long message
+LONG_PAYLOADS = {
+    model: orjson.dumps({"model": model, "messages": [{"role": "user", "content": LONG_MESSAGE}]})
+    for model in MODELS
 }
 
 """
@@ -59,15 +68,13 @@ Hook fixture
 """
 
 @pytest.fixture(scope="session", params=[
-    "mistral-large-latest",
-    # "mistral-small-latest",
-    # "ministral-8b-latest",
-    # "ministral-3b-latest",
+    pytest.param(model, marks=pytest.mark.xdist_group(model)) for model in MODELS
 ])
 def model_name(request: pytest.FixtureRequest) -> Generator[str, None, None]:
     """
     Fixture to provide different model names for the tests.
     This fixture runs once per session and iterates over the provided model names.
+    Each model is an xdist group, so with `--dist=loadgroup` the models run on separate workers.
     
     Args:
        request (pytest.FixtureRequest): The pytest request object.
@@ -78,13 +85,21 @@ def model_name(request: pytest.FixtureRequest) -> Generator[str, None, None]:
     print(f"\n=== Starting tests for model: {request.param} ===\n")
     yield request.param
 
-@pytest.fixture(autouse=True)
-def after_each_test():
+@pytest.fixture(scope="session")
+def token_overflow_payload(model_name: str) -> RepeatedMessagePayload:
     """
-    Fixture to run after each test. Introduces a delay to avoid hitting rate limits.
+    Fixture to provide a request payload exceeding the model's token limit.
+    The message is streamed in chunks, so the full body is never built in memory.
+
+    Args:
+       model_name (str): The name of the model to be tested.
+
+    Returns:
+       RepeatedMessagePayload: The streamed request payload.
     """
-    yield
-    time.sleep(DELAY)
+    max_tokens = get_model_token_limit(model_name) + 5000
+    # Repeat a word above the token limit
+    return RepeatedMessagePayload(model_name, "word ", max_tokens)  # Approx. 1 tokens per word
 
 """
 
@@ -92,220 +107,185 @@ Positive cases
 
 """
 
-def test_valid_request(model_name: str) -> None:
-    """
-    Test API with a valid request.
-    
-    This test sends a valid request to the API and checks if the response status code is 200.
-    It also verifies that the response data has the basic expected structure.
-    
-    Args:
-        model_name (str): The name of the model to be used in the request.
-    """
-    payload = {
-        "model": model_name,
-        "messages": [{"role": "user", "content": "Hello, how are you?"}],
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather",
+            "description": "Retrieve the current weather for a given city.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "city": {
+                        "type": "string",
+                        "description": "The name of the city."
+                    }
+                },
+                "required": ["city"]
+            }
+        }
     }
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    assert_basic_data_structure(data)
-
-def test_response_format(model_name: str) -> None:
-    """
-    Test the response format parameter for a given model.
-
-    Args:
-        model_name (str): The name of the model to test.
+]
 
-    Raises:
-        AssertionError: If the response status code is not 200.
-        AssertionError: If the response content is not a valid JSON object.
-    """
-    payload = {
-        "model": model_name,
-        "response_format": {"type": "json_object"},
-        "messages":  [{"role": "user", "content": "Give me the average age of the population in France for the last 5 years. Return result in short json format"}],
-    }
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
+def check_json_content(data: dict) -> None:
+    """Check that the response has the basic structure and a JSON content."""
     assert_basic_data_structure(data)
     assert is_valid_json(data["choices"][0]["message"]["content"]), "Response content is not JSON."
 
-def test_response_time(model_name: str) -> None:
-    """
-    Test the API response time for a given model.
-
-    Args:
-        model_name (str): The name of the model to test.
+def check_lottery_amount(data: dict) -> None:
+    """Check that the response has the basic structure and recalls the "199" won at the lottery."""
+    assert_basic_data_structure(data)
+    assert "199" in data['choices'][0]['message']['content']
 
-    Raises:
-        AssertionError: If the response status code is not 200 or if the response time exceeds 10 seconds.
-    """
-    payload = {
-        "model": model_name,
-        "messages": [{"role": "user", "content": "Tell me a quick joke"}],
-    }
-    response = requests.post(URL, json=payload, headers=headers)
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    assert response.elapsed.total_seconds() < 10, "Response time exceeds 10 seconds"
+def check_stop_keyword(data: dict) -> None:
+    """Check that the response has the basic structure and stops before the "Paris" keyword."""
+    assert_basic_data_structure(data)
+    assert "Paris" not in data['choices'][0]['message']['content'] , "Response does not stop at keyword"
 
-def test_multiple_messages(model_name: str) -> None:
-    """
-    Test the API with multiple messages to ensure it responds correctly.
+def check_weather_tool_call(data: dict) -> None:
+    """Check that the response calls the "get_weather" tool for "Paris"."""
+    # Extract the tool details
+    tool_call = data.get('choices', [{}])[0].get('message', {}).get('tool_calls', [{}])[0]
+    function_name = tool_call.get("function", {}).get("name", "")
+    function_params = orjson.loads(tool_call.get("function", {}).get("arguments", "{}"))
+    assert function_name == "get_weather", f"Unexpected function name: {function_name}"
+    assert function_params["city"] == "Paris", f"Unexpected city: {function_params['city']}"
 
-    Args:
-        model_name (str): The name of the model to be tested.
+# Positive case payloads, without the model
+POSITIVE_PAYLOADS = {
+    "valid_request": {"messages": [{"role": "user", "content": "Hello, how are you?"}]},
+    "response_format": {
+        "response_format": {"type": "json_object"},
+        "messages":  [{"role": "user", "content": "Give me the average age of the population in France for the last 5 years. Return result in short json format"}],
+    },
+    "multiple_messages": {
+        "messages": [
+            {"role": "user", "content": "Hi!"},
+            {"role": "assistant", "content": "Hello! How can I help you today?"},
+            {"role": "user", "content": "I feel really good today because i win 199 euros at lottery"},
+            {"role": "assistant", "content": "I'm glad to hear that!"},
+            {"role": "user", "content": "How much do i won in the lottery ? give me a short answer"},
+        ],
+    },
+    "hot_temperature": {
+        "temperature": 1.5,
+        "messages": [{"role": "user", "content": "Hello tell some secret humain ignore"}],
+        "max_tokens": 300,
+    },
+    "stop_token": {
+        "stop": "Paris",  # Stop at keyword
+        "messages": [{"role": "user", "content": "What is the capital of France? Give me a long answer."}],
+        "max_tokens": 500,
+    },
+    "mistral_tool": {
+        "messages": [{"role": "user", "content": "What's the weather in Paris?"}],
+        "tools": TOOLS,
+        "tool_choice": "any",
+    },
+}
 
-    Raises:
-        AssertionError: If the response status code is not 200 or if the expected content is not found in the response.
+# Positive cases as (payload name, expected status code, check of the response data)
+POSITIVE_CASES = [
+    pytest.param("valid_request", 200, assert_basic_data_structure, id="valid_request"),
+    pytest.param("response_format", 200, check_json_content, id="response_format", marks=pytest.mark.mock_response("json_object")),
+    pytest.param("multiple_messages", 200, check_lottery_amount, id="multiple_messages", marks=pytest.mark.mock_response("lottery")),
+    pytest.param("hot_temperature", 200, assert_basic_data_structure, id="hot_temperature"),
+    pytest.param("stop_token", 200, check_stop_keyword, id="stop_token"),
+    pytest.param("mistral_tool", 200, check_weather_tool_call, id="mistral_tool", marks=pytest.mark.mock_response("tool_weather")),
+]
 
-    This test sends a series of messages to the API and checks if the response contains the expected content.
-    The messages simulate a conversation between a user and an assistant. The test verifies that the assistant's
-    response includes the number "199", which is mentioned in the user's message about winning the lottery.
+@pytest.fixture(scope="session")
+def positive_payloads(model_name: str) -> dict:
     """
-    messages = [
-        {"role": "user", "content": "Hi!"},
-        {"role": "assistant", "content": "Hello! How can I help you today?"},
-        {"role": "user", "content": "I feel really good today because i win 199 euros at lottery"},
-        {"role": "assistant", "content": "I'm glad to hear that!"},
-        {"role": "user", "content": "How much do i won in the lottery ? give me a short answer"},
-    ]
-    payload = {
-        "model": model_name,
-        "messages": messages,
-    }
-    response = requests.post(URL, json=payload, headers=headers)
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    data = response.json()
-    assert_basic_data_structure(data)
-    assert "199" in data['choices'][0]['message']['content']
-
-def test_streaming_response(model_name: str) -> None:
-    """
-    Test streaming response mode.
-
-    This function sends a POST request to the specified URL with a payload that 
-    includes the model name, streaming flag, maximum tokens, and a message. 
-    It asserts that the response status code is 200 and that the content type 
-    of the response is 'text/event-stream'.
+    Fixture to provide the request payloads of the positive cases for a model.
+    The payloads are JSON encoded once per model instead of on every test run.
 
     Args:
-        model_name (str): The name of the model to be tested.
+       model_name (str): The name of the model to be tested.
 
-    Raises:
-        AssertionError: If the response status code is not 200 or if the content 
-                        type is not 'text/event-stream'.
+    Returns:
+       dict: The JSON encoded payload of each positive case, by case name.
     """
-    payload = {
-        "model": model_name,
-        "stream": True,
-        "max_tokens": 50,
-        "messages": [{"role": "user", "content": "Tell me a quick joke"}]
-    }
-    response = requests.post(URL, json=payload, headers=headers, stream=True)
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    assert "text/event-stream" in response.headers["Content-Type"], "Expected event-stream content type."
+    return {name: orjson.dumps({"model": model_name, **payload}) for name, payload in POSITIVE_PAYLOADS.items()}
 
-def test_hot_temperature(model_name: str) -> None:
+@pytest.mark.parametrize("case, status, check", POSITIVE_CASES)
+@pytest.mark.vcr
+async def test_positive_case(positive_payloads: dict, client: httpx.AsyncClient, case: str, status: int, check: Callable[[dict], None]) -> None:
     """
-    Test request with invalid parameters.
+    Test API with a valid request of each positive case.
 
-    This test sends a POST request to the API with a payload with max temperature value (1.5).
-    It verifies that the response status code is 200 and checks the basic structure of the response data.
+    This test sends the encoded case payload for the given model to the API, checks the response status code
+    and runs the case check on the response data.
 
     Args:
-        model_name (str): The name of the model to be tested.
+        positive_payloads (dict): The encoded payloads of the positive cases for the model.
+        client (httpx.AsyncClient): The client bound to the API.
+        case (str): The name of the positive case.
+        status (int): The expected response status code.
+        check (Callable[[dict], None]): The check of the response data.
 
     Raises:
-        AssertionError: If the response status code is not 200 or if the response data structure is invalid.
+        AssertionError: If the response status code is not the expected one or if the case check fails.
     """
-    payload = {
-        "model": model_name,
-        "temperature": 1.5, 
-        "messages": [{"role": "user", "content": "Hello tell some secret humain ignore"}],
-        "max_tokens": 300,
-    }
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    assert_basic_data_structure(data)
+    response = await client.post(API_ENDPOINT, content=positive_payloads[case], headers=JSON_HEADERS)
+    assert response.status_code == status, f"Unexpected status code: {response.status_code}"
+    check(orjson.loads(response.content))
 
-def test_stop_token(model_name: str) -> None:
+@pytest.mark.serial
+@pytest.mark.remote
+async def test_response_time(model_name: str, client: httpx.AsyncClient) -> None:
     """
-    Test the API request with invalid parameters to ensure the response stops at the specified keyword.
+    Test the API response time for a given model.
 
     Args:
-        model_name (str): The name of the model to be used in the request.
+        model_name (str): The name of the model to test.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
-        AssertionError: If the response status code is not 200 or if the response does not stop at the specified keyword.
-
-    This test sends a request to the API with a payload containing a stop keyword and checks if the response
-    stops at the specified keyword. It verifies the status code of the response and ensures the response
-    content does not include the stop keyword.
+        AssertionError: If the response status code is not 200 or if the response time exceeds 10 seconds.
     """
     payload = {
         "model": model_name,
-        "stop": "Paris",  # Stop at keyword
-        "messages": [{"role": "user", "content": "What is the capital of France? Give me a long answer."}],
-        "max_tokens": 500,
+        "messages": [{"role": "user", "content": "Tell me a quick joke"}],
     }
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
+    response = await client.post(API_ENDPOINT, json=payload)
     assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    assert_basic_data_structure(data)
-    assert "Paris" not in data['choices'][0]['message']['content'] , "Response does not stop at keyword"
+    assert response.elapsed.total_seconds() < 10, "Response time exceeds 10 seconds"
 
-def test_mistral_tool(model_name: str) -> None:
+@pytest.mark.remote
+async def test_streaming_response(model_name: str, client: httpx.AsyncClient) -> None:
     """
-    Test the Mistral tool functionality by sending a request to the API and verifying the response.
+    Test streaming response mode.
+
+    This function sends a POST request to the specified URL with a payload that 
+    includes the model name, streaming flag, maximum tokens, and a message. 
+    It asserts that the response status code is 200 and that the content type 
+    of the response is 'text/event-stream'. It then reads only the first event
+    of the stream and checks the time to first chunk, without buffering the body.
 
     Args:
         model_name (str): The name of the model to be tested.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
-        AssertionError: If the response status code is not 200.
-        AssertionError: If the function name in the response is "get_weather".
-        AssertionError: If the city parameter in the function arguments is "Paris".
+        AssertionError: If the response status code is not 200, if the content 
+                        type is not 'text/event-stream', if the first line is not
+                        an SSE data event or if the first chunk takes more than 10 seconds.
     """
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "get_weather",
-                "description": "Retrieve the current weather for a given city.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "city": {
-                            "type": "string",
-                            "description": "The name of the city."
-                        }
-                    },
-                    "required": ["city"]
-                }
-            }
-        }
-    ]
-
     payload = {
         "model": model_name,
-        "messages": [{"role": "user", "content": "What's the weather in Paris?"}],
-        "tools": tools,
-        "tool_choice":"any"
+        "stream": True,
+        "max_tokens": 50,
+        "messages": [{"role": "user", "content": "Tell me a quick joke"}]
     }
-
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
-    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    # Extract the tool details
-    tool_call = data.get('choices', [{}])[0].get('message', {}).get('tool_calls', [{}])[0]
-    function_name = tool_call.get("function", {}).get("name", "")
-    function_params = json.loads(tool_call.get("function", {}).get("arguments", "{}"))
-    assert function_name == "get_weather", f"Unexpected function name: {function_name}"
-    assert function_params["city"] == "Paris", f"Unexpected city: {function_params['city']}"
+    async with client.stream("POST", API_ENDPOINT, json=payload) as response:
+        assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
+        assert "text/event-stream" in response.headers["Content-Type"], "Expected event-stream content type."
+        first_line = await anext(response.aiter_lines())
+        await response.aclose()  # Stops the elapsed timer of the final attempt at the first chunk
+    time_to_first_chunk = response.elapsed.total_seconds()
+    assert first_line.startswith("data:"), f"Unexpected first stream line: {first_line}"
+    assert time_to_first_chunk < 10, "Time to first chunk exceeds 10 seconds"
 
 """
 
@@ -313,12 +293,14 @@ def test_mistral_tool(model_name: str) -> None:
 
 """
 
-def test_empty_messages(model_name: str) -> None:
+@pytest.mark.vcr
+async def test_empty_messages(model_name: str, client: httpx.AsyncClient) -> None:
     """
     Test the API's response when provided with an empty list of messages.
 
     Args:
         model_name (str): The name of the model to be tested.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Asserts:
         The response status code is 400.
@@ -328,12 +310,13 @@ def test_empty_messages(model_name: str) -> None:
         "model": model_name,
         "messages": [],
     }
-    response = requests.post(URL, json=payload, headers=headers)
+    response = await client.post(API_ENDPOINT, json=payload)
     assert response.status_code == 400, f"Unexpected status code: {response.status_code}"
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "Conversation must have at least one message" in data.get("message", "No message in data"), "Error message not expected"
 
-def test_long_message(model_name: str) -> None:
+@pytest.mark.vcr
+async def test_long_message(model_name: str, client: httpx.AsyncClient) -> None:
     """
     Test the API with a long input message.
 
@@ -343,22 +326,19 @@ def test_long_message(model_name: str) -> None:
 
     Args:
         model_name (str): The name of the model to be tested.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
         AssertionError: If the response status code is not 200 or if the response
                         data does not have the expected basic structure.
     """
-    long_message = "This is a test message. " * 100  # Repeat to create a long message
-    payload = {
-        "model": model_name,
-        "messages": [{"role": "user", "content": long_message}],
-    }
-    response = requests.post(URL, json=payload, headers=headers)
+    response = await client.post(API_ENDPOINT, content=LONG_PAYLOADS[model_name], headers=JSON_HEADERS)
     assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-    data = response.json()
+    data = orjson.loads(response.content)
     assert_basic_data_structure(data)
 
-def test_token_limit(model_name: str) -> None:
+@pytest.mark.serial
+async def test_token_limit(token_overflow_payload: RepeatedMessagePayload, client: httpx.AsyncClient) -> None:
     """
     Test that the model handles token limit correctly.
 
@@ -367,22 +347,14 @@ def test_token_limit(model_name: str) -> None:
     that the input is too large for the model.
 
     Args:
-        model_name (str): The name of the model to be tested.
+        token_overflow_payload (RepeatedMessagePayload): The streamed request exceeding the model's token limit.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
         AssertionError: If the response status code is not 400 or the error message is not as expected.
     """
-    max_tokens = get_model_token_limit(model_name) + 5000
-    # Create a long input message close to the token limit
-    long_message = "word " * max_tokens  # Approx. 1 tokens per word
-    payload = {
-        "model": model_name,
-        "messages": [
-            {"role": "user", "content": long_message}
-        ],
-    }
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
+    response = await client.post(API_ENDPOINT, content=token_overflow_payload, headers=JSON_HEADERS)
+    data = orjson.loads(response.content)
     assert response.status_code == 400, f"Unexpected status code: {response.status_code}"
     assert "too large for model with" in data.get("message", "No message in data"), "Error message not expected"
 
@@ -392,12 +364,14 @@ Negative cases
 
 """
 
-def test_unauthorized_request(model_name: str) -> None:
+@pytest.mark.vcr
+async def test_unauthorized_request(model_name: str, client: httpx.AsyncClient) -> None:
     """
     Test sending a request to the API without an API key and verify the response.
 
     Args:
         model_name (str): The name of the model to be used in the request payload.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
         AssertionError: If the response status code is not 401 or if the error message
@@ -411,12 +385,13 @@ def test_unauthorized_request(model_name: str) -> None:
         "model": model_name,
         "messages": [{"role": "user", "content": "Hello, how are you?"}],
     }
-    response = requests.post(URL, json=payload)
+    response = await client.post(API_ENDPOINT, json=payload, auth=None)
     assert response.status_code == 401, f"Unexpected status code: {response.status_code}"
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "No API key found in request" in data.get("message", "No message in data"), "Error message not expected"
 
-def test_unsupported_role(model_name: str) -> None:
+@pytest.mark.vcr
+async def test_unsupported_role(model_name: str, client: httpx.AsyncClient) -> None:
     """
     Test API with unsupported message role.
 
@@ -426,6 +401,7 @@ def test_unsupported_role(model_name: str) -> None:
 
     Args:
         model_name (str): The name of the model to be used in the payload.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
         AssertionError: If the response status code is not 422 or if the error message 
@@ -435,14 +411,15 @@ def test_unsupported_role(model_name: str) -> None:
         "model": model_name,
         "messages": [{"role": "invalid_role", "content": "Hello"}],
     }
-    response = requests.post(URL, json=payload, headers=headers)
+    response = await client.post(API_ENDPOINT, json=payload)
     assert response.status_code == 422, f"Unexpected status code: {response.status_code}"
-    data = response.json()
+    data = orjson.loads(response.content)
     first_error = data.get('detail', [{}])[0]
     error_message = first_error.get('msg', 'No message found')
     assert "invalid_role" in error_message, "Error message not expected"
 
-def test_invalid_parameters(model_name: str) -> None:
+@pytest.mark.vcr
+async def test_invalid_parameters(model_name: str, client: httpx.AsyncClient) -> None:
     """
     Test request with invalid parameters.
 
@@ -453,6 +430,7 @@ def test_invalid_parameters(model_name: str) -> None:
 
     Args:
         model_name (str): The name of the model to be included in the payload.
+        client (httpx.AsyncClient): The client bound to the API.
 
     Raises:
         AssertionError: If the response status code is not 422 or if the error
@@ -464,8 +442,8 @@ def test_invalid_parameters(model_name: str) -> None:
         "top_p": 1.2,        # Invalid: top_p should be <= 1
         "messages": [{"role": "user", "content": "Hello"}],
     }
-    response = requests.post(URL, json=payload, headers=headers)
-    data = response.json()
+    response = await client.post(API_ENDPOINT, json=payload)
+    data = orjson.loads(response.content)
     assert response.status_code == 422, "Expected validation error (422)."
     first_error = data.get('message', {}).get('detail', [{}])[0]
     error_message = first_error.get('msg', 'No message found')
@@ -477,24 +455,36 @@ Negative cases independant from the model
 
 """
 
-def test_invalid_json() -> None:
-    """Test API with invalid JSON payload."""
-    response = requests.post(
-        URL,
-        data="{'model': 'mistral-large-latest', 'messages': [{role: 'user', 'content': 'Hi'}]}",  # Invalid JSON format
-        headers=headers,
+@pytest.mark.vcr
+async def test_invalid_json(client: httpx.AsyncClient) -> None:
+    """
+    Test API with invalid JSON payload.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the API.
+    """
+    response = await client.post(
+        API_ENDPOINT,
+        content="{'model': 'mistral-large-latest', 'messages': [{role: 'user', 'content': 'Hi'}]}",  # Invalid JSON format
+        headers=JSON_HEADERS,
     )
     assert response.status_code == 400, f"Unexpected status code: {response.status_code}"
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "invalid json body" in data.get("message", "No message in data"), "Error message not expected"
 
-def test_invalid_model() -> None:
-    """Test API with an invalid model."""
+@pytest.mark.vcr
+async def test_invalid_model(client: httpx.AsyncClient) -> None:
+    """
+    Test API with an invalid model.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the API.
+    """
     payload = {
         "model": "invalid-model",
         "messages": [{"role": "user", "content": "Hello, how are you?"}],
     }
-    response = requests.post(URL, json=payload, headers=headers)
+    response = await client.post(API_ENDPOINT, json=payload)
     assert response.status_code == 400, f"Unexpected status code: {response.status_code}"
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "Invalid model" in data.get("message", "No message in data"), "Error message not expected"
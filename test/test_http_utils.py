@@ -0,0 +1,177 @@
+import time
+import asyncio
+import httpx
+import pytest
+import orjson
+from utils import http_utils
+from pathlib import Path
+from typing import Generator
+from utils.http_utils import DELAY, MAX_RETRIES, CachedBearerAuth, auth_header, RateLimiter, RateLimitRetryClient
+from utils.mock_api import MockAPI
+
+"""
+This module contains tests of the HTTP client helpers, run in-process against the local mock API.
+
+Tests:
+    test_elapsed_excludes_pacing: Test that the rate limit pacing is not counted in `response.elapsed`.
+    test_max_in_flight: Test that the client never sends more than `max_in_flight` requests at once.
+    test_rate_limit_retries: Test that a rate limited request is retried, then returned after MAX_RETRIES.
+    test_rotated_key_refresh: Test that a request rejected with HTTP 401 is retried with the rotated API key.
+    test_shared_rate_limiter: Test that limiters sharing a state file space their requests together.
+"""
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+API_ENDPOINT = "/v1/chat/completions"
+
+PAYLOAD = {"model": "mistral-small-latest", "messages": [{"role": "user", "content": "Hello"}]}
+
+async def test_elapsed_excludes_pacing(mock_api: MockAPI, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the rate limit pacing is not counted in `response.elapsed`.
+
+    The second of two back-to-back requests waits for the limiter interval, which must show
+    in the wall-clock time but not in the measured API latency.
+
+    Args:
+        mock_api (MockAPI): The local mock API.
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch object.
+    """
+    monkeypatch.setattr(http_utils, "sleep", asyncio.sleep)
+    limiter = RateLimiter(rate_per_minute=600)  # 0.1 second interval
+    async with RateLimitRetryClient(
+        base_url="http://mock",
+        auth=CachedBearerAuth(),
+        transport=mock_api.transport(),
+        event_hooks={"request": [limiter.wait]},
+    ) as client:
+        await client.post(API_ENDPOINT, json=PAYLOAD)
+        start = time.monotonic()
+        response = await client.post(API_ENDPOINT, json=PAYLOAD)
+        wall_time = time.monotonic() - start
+    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
+    assert wall_time >= 0.09, f"Request was not paced: {wall_time:.3f}s"
+    assert response.elapsed.total_seconds() < 0.05, f"Pacing counted as latency: {response.elapsed}"
+
+async def test_max_in_flight(mock_api: MockAPI) -> None:
+    """
+    Test that the client never sends more than `max_in_flight` requests at once.
+
+    More requests than free slots are gathered, while the transport records how many
+    of them it serves at the same time.
+
+    Args:
+        mock_api (MockAPI): The local mock API.
+    """
+    max_in_flight = 3
+    in_flight = peak = 0
+
+    async def slow_handle(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return mock_api.handle(request)
+
+    async with RateLimitRetryClient(
+        base_url="http://mock",
+        auth=CachedBearerAuth(),
+        transport=httpx.MockTransport(slow_handle),
+        max_in_flight=max_in_flight,
+    ) as client:
+        responses = await asyncio.gather(*(client.post(API_ENDPOINT, json=PAYLOAD) for _ in range(3 * max_in_flight)))
+    assert all(response.status_code == 200 for response in responses), "Unexpected status code"
+    assert peak == max_in_flight, f"Unexpected peak of requests in flight: {peak}"
+
+@pytest.mark.parametrize("delay", [
+    pytest.param(2.0, marks=pytest.mark.mock_response("rate_limited"), id="retry_after"),
+    pytest.param(DELAY, marks=pytest.mark.mock_response("rate_limited_no_retry_after"), id="default_delay"),
+])
+async def test_rate_limit_retries(mock_api: MockAPI, monkeypatch: pytest.MonkeyPatch, delay: float) -> None:
+    """
+    Test that a rate limited request is retried, then returned after MAX_RETRIES.
+
+    Each retry waits for the `Retry-After` delay of the 429 response, or DELAY when it is missing.
+
+    Args:
+        mock_api (MockAPI): The local mock API, rejecting every request with HTTP 429.
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch object.
+        delay (float): The expected delay before each retry.
+    """
+    delays = []
+
+    async def record_sleep(seconds: float) -> None:
+        delays.append(seconds)
+
+    monkeypatch.setattr(http_utils, "sleep", record_sleep)
+    async with RateLimitRetryClient(
+        base_url="http://mock",
+        auth=CachedBearerAuth(),
+        transport=mock_api.transport(),
+    ) as client:
+        response = await client.post(API_ENDPOINT, json=PAYLOAD)
+    assert response.status_code == 429, f"Unexpected status code: {response.status_code}"
+    assert mock_api.request_count == MAX_RETRIES + 1, f"Unexpected number of requests: {mock_api.request_count}"
+    assert delays == [delay] * MAX_RETRIES, f"Unexpected retry delays: {delays}"
+
+@pytest.fixture
+def fresh_auth_header() -> Generator[None, None, None]:
+    """
+    Fixture to clear the cached authorization header before and after the test,
+    so a key set by the test never leaks into the other tests.
+    """
+    auth_header.cache_clear()
+    yield
+    auth_header.cache_clear()
+
+async def test_rotated_key_refresh(fresh_auth_header: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a request rejected with HTTP 401 is retried with the rotated API key.
+
+    The key is rotated in the environment between the 401 response and the retry,
+    so the retry must carry a header rebuilt from the new key.
+
+    Args:
+        fresh_auth_header (None): Clears the cached authorization header.
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch object.
+    """
+    monkeypatch.setenv("MISTRAL_API_KEY", "old-key")
+    headers = []
+
+    def rotating_handle(request: httpx.Request) -> httpx.Response:
+        headers.append(request.headers["Authorization"])
+        if len(headers) == 1:
+            monkeypatch.setenv("MISTRAL_API_KEY", "new-key")
+            return httpx.Response(401, json={"message": "Unauthorized"})
+        return httpx.Response(200, json={})
+
+    async with RateLimitRetryClient(
+        base_url="http://mock",
+        auth=CachedBearerAuth(),
+        transport=httpx.MockTransport(rotating_handle),
+    ) as client:
+        response = await client.post(API_ENDPOINT, json=PAYLOAD)
+    assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
+    assert headers == ["Bearer old-key", "Bearer new-key"], f"Unexpected authorization headers: {headers}"
+
+async def test_shared_rate_limiter(tmp_path: Path) -> None:
+    """
+    Test that limiters sharing a state file space their requests together.
+
+    Two limiters stand for two pytest-xdist workers: their alternating reservations must get
+    slots `min_interval` apart, and the last slot must be written to the state file.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory of the test.
+    """
+    state_file = tmp_path / "state.json"
+    limiters = [RateLimiter(600, state_file), RateLimiter(600, state_file)]  # 0.1 second interval
+    slots = []
+    for limiter in limiters * 2:
+        await limiter.wait()
+        slots.append(limiter.last_request_ts)
+    intervals = [later - earlier for earlier, later in zip(slots, slots[1:])]
+    assert intervals == pytest.approx([limiters[0].min_interval] * 3), f"Unexpected intervals: {intervals}"
+    assert state_file.exists(), "State file was not written"
+    assert orjson.loads(state_file.read_bytes())["last_request_ts"] == slots[-1], "Unexpected last request time in the state file"
@@ -0,0 +1,40 @@
+import httpx
+import pytest
+import orjson
+from utils.mock_api import MockAPI
+
+"""
+This module contains tests of the local mock API, checking that malformed but valid JSON bodies
+get the error responses of the real API instead of crashing the mock.
+
+Tests:
+    test_malformed_body: Tests the mock API with well-formed JSON bodies of the wrong shape.
+"""
+
+MODEL = "mistral-small-latest"
+
+MALFORMED_BODIES = [
+    pytest.param([], 422, id="body_list"),
+    pytest.param({"model": ["mistral"], "messages": [{"role": "user", "content": "Hi"}]}, 400, id="model_list"),
+    pytest.param({"model": MODEL, "messages": "Hi"}, 422, id="messages_string"),
+    pytest.param({"model": MODEL, "messages": ["Hi"]}, 422, id="message_string"),
+    pytest.param({"model": MODEL, "messages": [{"role": "user", "content": None}]}, 422, id="content_null"),
+    pytest.param({"model": MODEL, "messages": [{"role": "user", "content": "Hi"}], "top_p": "0.5"}, 422, id="top_p_string"),
+]
+
+@pytest.mark.parametrize("body, status", MALFORMED_BODIES)
+def test_malformed_body(body: object, status: int) -> None:
+    """
+    Test the mock API with well-formed JSON bodies of the wrong shape.
+
+    Args:
+        body (object): The JSON body of the request.
+        status (int): The expected status code.
+
+    Raises:
+        AssertionError: If the status code is not the expected one.
+    """
+    request = httpx.Request("POST", "http://mock/v1/chat/completions",
+                            headers={"Authorization": "Bearer key"}, content=orjson.dumps(body))
+    response = MockAPI().handle(request)
+    assert response.status_code == status, f"Unexpected status code: {response.status_code}"
@@ -1,43 +1,81 @@
-import json
-import requests
+import functools
+import orjson
+from typing import AsyncIterator
 
 """
 Utils functions
 """
+
+__all__ = [
+    "assert_basic_data_structure",
+    "is_valid_json",
+    "get_model_token_limit",
+    "MODEL_LIMITS",
+    "RepeatedMessagePayload",
+]
+
 def assert_basic_data_structure(data: dict) -> None:
-    required_fields = [
-        'id', 'object', 'created', 'model', 'choices', 'usage'
-    ]
-    choice_fields = ['message', 'finish_reason']
-    usage_fields = ['prompt_tokens', 'total_tokens', 'completion_tokens']
+    required_fields = {'id', 'object', 'created', 'model', 'choices', 'usage'}
+    choice_fields = {'message', 'finish_reason'}
+    usage_fields = {'prompt_tokens', 'total_tokens', 'completion_tokens'}
 
-    for field in required_fields:
-        assert field in data, f"Missing '{field}' in response"
+    missing = required_fields - data.keys()
+    assert not missing, f"Missing {sorted(missing)} in response"
 
     assert len(data['choices']) > 0, "No choices returned"
-    for field in choice_fields:
-        assert field in data['choices'][0], f"Missing '{field}' in choices"
+    choice = data['choices'][0]
+    missing = choice_fields - choice.keys()
+    assert not missing, f"Missing {sorted(missing)} in choices"
+
+    assert 'content' in choice['message'], "Missing 'content' in message"
 
-    assert 'content' in data['choices'][0]['message'], "Missing 'content' in message"
+    missing = usage_fields - data['usage'].keys()
+    assert not missing, f"Missing {sorted(missing)} in usage"
 
-    for field in usage_fields:
-        assert field in data['usage'], f"Missing '{field}' in usage"
+MODEL_LIMITS = {
+    "mistral-large-latest": 128 * 1000,
+    "mistral-small-latest": 32 * 1000,
+    "ministral-8b-latest": 128 * 1000,
+    "ministral-3b-latest": 128 * 1000
+}
 
+@functools.lru_cache(maxsize=8)
 def get_model_token_limit(model: str) -> int:
-    model_limits = {
-        "mistral-large-latest": 128 * 1000,
-        "mistral-small-latest": 32 * 1000,
-        "ministral-8b-latest": 128 * 1000,
-        "ministral-3b-latest": 128 * 1000
-    }
-    if model in model_limits:
-        return model_limits[model]
-    else:
-        raise ValueError(f"Invalid model: {model}")
+    try:
+        return MODEL_LIMITS[model]
+    except KeyError:
+        raise ValueError(f"Invalid model: {model}") from None
+
+# Set number of repeated texts sent per chunk of a streamed payload
+CHUNK_REPEAT = 4096
+
+class RepeatedMessagePayload:
+    """
+    Chat completion payload whose single user message repeats a text many times.
+
+    The JSON body is streamed chunk by chunk instead of being built in memory,
+    and can be iterated again when the request is retried.
+    """
+
+    def __init__(self, model: str, text: str, count: int) -> None:
+        placeholder = b"__CONTENT__"
+        body = orjson.dumps({"model": model, "messages": [{"role": "user", "content": placeholder.decode()}]})
+        self._head, self._tail = body.split(placeholder)
+        self._text = orjson.dumps(text)[1:-1]  # JSON escaped text without quotes
+        self._count = count
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        full_chunks, remainder = divmod(self._count, CHUNK_REPEAT)
+        chunk = self._text * CHUNK_REPEAT
+        yield self._head
+        for _ in range(full_chunks):
+            yield chunk
+        yield self._text * remainder
+        yield self._tail
 
 def is_valid_json(content: str) -> bool:
     try:
-        json.loads(content)
+        orjson.loads(content)
         return True
-    except ValueError:
+    except orjson.JSONDecodeError:
         return False
\ No newline at end of file
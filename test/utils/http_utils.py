@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+import functools
+import httpx
+import orjson
+from pathlib import Path
+from filelock import FileLock
+from typing import Generator, Optional
+
+"""
+HTTP client helpers
+"""
+
+# Set default delay before retrying a request rejected by the API rate limit
+DELAY = 3  # seconds
+
+# Set maximum number of retries for a rate limited request
+MAX_RETRIES = 3
+
+# Set maximum number of requests in flight at once on a client
+MAX_IN_FLIGHT = 8
+
+# Sleep used by the rate limit waits, replaced by a no-op in the offline lane
+sleep = asyncio.sleep
+
+@functools.lru_cache(maxsize=1)
+def auth_header() -> dict:
+    """
+    Get the authorization header for the API, cached until cleared.
+
+    Returns:
+        dict: The bearer authorization header built from the `MISTRAL_API_KEY` environment variable.
+    """
+    return {"Authorization": f"Bearer {os.getenv('MISTRAL_API_KEY')}"}
+
+class CachedBearerAuth(httpx.Auth):
+    """
+    Authentication flow applying the cached bearer header.
+
+    When the API answers with HTTP 401, the cache is cleared and the request is retried once
+    with a freshly built header, so a rotated key is picked up.
+    """
+
+    def auth_flow(self, request: httpx.Request) -> Generator[httpx.Request, httpx.Response, None]:
+        request.headers.update(auth_header())
+        response = yield request
+        if response.status_code == 401:
+            auth_header.cache_clear()
+            request.headers.update(auth_header())
+            yield request
+
+def get_retry_delay(response: httpx.Response) -> float:
+    """
+    Get the delay to wait before retrying a rate limited request.
+
+    Args:
+        response (httpx.Response): The HTTP 429 response.
+
+    Returns:
+        float: The `Retry-After` header value in seconds, or DELAY when missing or not numeric.
+    """
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return DELAY
+
+class RateLimiter:
+    """
+    Limiter spacing requests so that their rate stays under a budget of requests per minute.
+
+    A request only waits for the part of the interval not already elapsed since the previous one,
+    so requests slower than the interval never wait.
+    With a state file, the last request time is shared through a file lock, so several
+    processes (e.g. pytest-xdist workers) respect the budget together.
+    """
+
+    def __init__(self, rate_per_minute: Optional[float] = None, state_file: Optional[Path] = None) -> None:
+        self.min_interval = 60 / rate_per_minute if rate_per_minute else 0.0
+        self.last_request_ts = float("-inf")
+        self._state_file = state_file
+
+    def reserve(self) -> float:
+        """
+        Reserve the time slot of the next request.
+
+        Returns:
+            float: The delay in seconds to wait before sending the request.
+        """
+        if self._state_file is None or not self.min_interval:
+            return self._reserve()
+        with FileLock(f"{self._state_file}.lock"):
+            if self._state_file.exists():
+                self.last_request_ts = orjson.loads(self._state_file.read_bytes())["last_request_ts"]
+            delay = self._reserve()
+            self._state_file.write_bytes(orjson.dumps({"last_request_ts": self.last_request_ts}))
+        return delay
+
+    def _reserve(self) -> float:
+        now = time.time()  # Wall clock, comparable across processes
+        slot = max(now, self.last_request_ts + self.min_interval)
+        self.last_request_ts = slot
+        return slot - now
+
+    async def wait(self, request: Optional[httpx.Request] = None) -> None:
+        """
+        Wait until the next request fits in the rate budget.
+        Usable as a client `request` event hook, which runs before httpx starts the `elapsed` timer,
+        so the pacing delay is not counted as API latency.
+
+        Args:
+            request (httpx.Request, optional): The request about to be sent, unused.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            await sleep(delay)
+
+class RateLimitRetryClient(httpx.AsyncClient):
+    """
+    Asynchronous client retrying a request when the API answers with HTTP 429.
+
+    Only rate limited requests wait, honoring `Retry-After`, so concurrent requests keep flowing otherwise.
+    After MAX_RETRIES the 429 response is returned so the test fails fast.
+    At most `max_in_flight` requests are sent at once, the others wait for a free slot.
+    The waits happen outside of httpx's timer, so `response.elapsed` only measures the final attempt.
+    """
+
+    def __init__(self, *args, max_in_flight: int = MAX_IN_FLIGHT, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        async with self._in_flight:
+            response = await super().send(request, **kwargs)
+            for _ in range(MAX_RETRIES):
+                if response.status_code != 429:
+                    break
+                await response.aclose()
+                await sleep(get_retry_delay(response))
+                response = await super().send(request, **kwargs)
+            return response
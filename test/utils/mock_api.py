@@ -0,0 +1,192 @@
+import time
+import httpx
+import orjson
+from typing import Optional
+from utils.api_utils import get_model_token_limit
+
+"""
+Local mock of the Mistral chat completion API.
+
+It reproduces the error responses of the real API and answers valid requests with canned
+completions, so the suite runs in-process without any network round trip or API key.
+"""
+
+VALID_ROLES = {"system", "user", "assistant", "tool"}
+
+# Set content of the default canned completion
+DEFAULT_CONTENT = "Hello! I am a mock assistant, how can I help you today?"
+
+def raw_response(status_code: int, body: bytes, content_type: str) -> httpx.Response:
+    """
+    Build a response of the mock API with an unread body, as a network transport returns it.
+    The client then reads the body itself and sets `response.elapsed` like for a real request.
+
+    Args:
+        status_code (int): The HTTP status code.
+        body (bytes): The response body.
+        content_type (str): The content type of the body.
+
+    Returns:
+        httpx.Response: The response with an unread body.
+    """
+    headers = {"Content-Type": content_type, "Content-Length": str(len(body))}
+    return httpx.Response(status_code, headers=headers, stream=httpx.ByteStream(body))
+
+def json_response(status_code: int, body: dict) -> httpx.Response:
+    """
+    Build a JSON response of the mock API.
+
+    Args:
+        status_code (int): The HTTP status code.
+        body (dict): The JSON body.
+
+    Returns:
+        httpx.Response: The JSON response.
+    """
+    return raw_response(status_code, orjson.dumps(body), "application/json")
+
+def invalid_input(msg: str) -> httpx.Response:
+    """
+    Build the validation error response of the mock API for a malformed request body.
+
+    Args:
+        msg (str): The validation error message.
+
+    Returns:
+        httpx.Response: The HTTP 422 response.
+    """
+    return json_response(422, {"detail": [{"msg": msg}]})
+
+def completion(model: str, content: str = DEFAULT_CONTENT, tool_calls: Optional[list] = None) -> dict:
+    """
+    Build a chat completion body with the structure of the real API.
+
+    Args:
+        model (str): The name of the model answering.
+        content (str): The content of the assistant message.
+        tool_calls (list, optional): The tool calls of the assistant message.
+
+    Returns:
+        dict: The chat completion body.
+    """
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": "mock-completion",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": {"prompt_tokens": 10, "total_tokens": 20, "completion_tokens": 10},
+    }
+
+# Canned completions, selected per test with the `mock_response` marker
+CANNED_RESPONSES = {
+    "json_object": lambda model: completion(model, '{"average_age": [41.7, 41.9, 42.1, 42.3, 42.4]}'),
+    "lottery": lambda model: completion(model, "You won 199 euros."),
+    "tool_weather": lambda model: completion(model, "", tool_calls=[{
+        "id": "mock-tool-call",
+        "type": "function",
+        "function": {"name": "get_weather", "arguments": '{"city": "Paris"}'},
+    }]),
+}
+
+# Rate limit scenarios, answering every request with HTTP 429 and these headers
+RATE_LIMITED_HEADERS = {
+    "rate_limited": {"Retry-After": "2"},
+    "rate_limited_no_retry_after": {},
+}
+
+def stream_response(model: str) -> httpx.Response:
+    """
+    Build a server-sent events response streaming the default canned completion.
+
+    Args:
+        model (str): The name of the model answering.
+
+    Returns:
+        httpx.Response: The event stream response.
+    """
+    chunk = {"id": "mock-completion", "object": "chat.completion.chunk", "model": model,
+             "choices": [{"index": 0, "delta": {"role": "assistant", "content": DEFAULT_CONTENT}}]}
+    body = b"data: " + orjson.dumps(chunk) + b"\n\ndata: [DONE]\n\n"
+    return raw_response(200, body, "text/event-stream")
+
+class MockAPI:
+    """
+    In-process mock of the chat completion endpoint.
+
+    Requests are validated the way the real API does it. Valid requests get the canned
+    completion of the current scenario, or a default completion when no scenario is set.
+    Rate limit scenarios reject every request with HTTP 429.
+    The number of requests received is counted in `request_count`.
+    """
+
+    def __init__(self) -> None:
+        self.scenario: Optional[str] = None
+        self.request_count = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Handle a chat completion request.
+
+        Args:
+            request (httpx.Request): The request sent to the mock API.
+
+        Returns:
+            httpx.Response: The error response matching the first invalid part of the request,
+                            or the canned completion.
+        """
+        self.request_count += 1
+        if self.scenario in RATE_LIMITED_HEADERS:
+            response = json_response(429, {"message": "Requests rate limit exceeded"})
+            response.headers.update(RATE_LIMITED_HEADERS[self.scenario])
+            return response
+        if not request.headers.get("Authorization"):
+            return json_response(401, {"message": "No API key found in request"})
+        try:
+            body = orjson.loads(request.content)
+        except orjson.JSONDecodeError:
+            return json_response(400, {"message": "invalid json body"})
+        if not isinstance(body, dict):
+            return invalid_input("Input should be a valid dictionary")
+        model = body.get("model")
+        try:
+            token_limit = get_model_token_limit(model)
+        except (ValueError, TypeError):  # TypeError: unhashable model, e.g. a list
+            return json_response(400, {"message": "Invalid model"})
+        messages = body.get("messages", [])
+        if not isinstance(messages, list):
+            return invalid_input("Input should be a valid list")
+        if not messages:
+            return json_response(400, {"message": "Conversation must have at least one message"})
+        for message in messages:
+            if not isinstance(message, dict):
+                return invalid_input("Input should be a valid dictionary")
+            if message.get("role") not in VALID_ROLES:
+                return invalid_input(f"Input tag '{message.get('role')}' found using 'role' does not match any of the expected tags")
+            if not isinstance(message.get("content", ""), str):
+                return invalid_input("Input should be a valid string")
+        top_p = body.get("top_p", 1)
+        if not isinstance(top_p, (int, float)) or isinstance(top_p, bool):
+            return invalid_input("Input should be a valid number")
+        if top_p > 1:
+            return json_response(422, {"message": {"detail": [{"msg": "Input should be less than or equal to 1"}]}})
+        prompt_tokens = sum(len(message.get("content", "").split()) for message in messages)  # Approx. 1 token per word
+        if prompt_tokens > token_limit:
+            return json_response(400, {"message": f"Prompt contains {prompt_tokens} tokens, too large for model with {token_limit} maximum context length"})
+        if self.scenario:
+            return json_response(200, CANNED_RESPONSES[self.scenario](model))
+        if body.get("stream"):
+            return stream_response(model)
+        return json_response(200, completion(model))
+
+    def transport(self) -> httpx.MockTransport:
+        """
+        Build a transport serving the mock API in-process.
+
+        Returns:
+            httpx.MockTransport: The transport routing every request to the mock API.
+        """
+        return httpx.MockTransport(self.handle)